@@ -0,0 +1,201 @@
+# src/explore/profile_features.py
+
+import argparse
+import json
+import sys
+import time
+import pandas as pd
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "warehouse"))
+from feature_store import DAILY_SCHEMA, INPUT_CSV, STORE_DIR, iter_store_chunks
+
+# -------------------------
+# 1. Configuration
+# -------------------------
+OUTPUT_JSON = Path("data/processed/feature_profile.json")
+FEATURES = [c for c in DAILY_SCHEMA if c not in ("cafe_code", "date")]
+
+# Plausible physical ranges; values outside are counted as out of range
+EXPECTED_RANGES = {
+    "pm25_aod_proxy": (0.0, 5.0),
+    "temp_max": (-30.0, 45.0),
+    "temp_min": (-35.0, 40.0),
+    "precip_mm": (0.0, 200.0),
+    "ndvi": (-1.0, 1.0),
+    "nightlight": (0.0, 1000.0),
+}
+
+# A cafe whose latest valid value is older than this is reported as stale
+STALE_AFTER_DAYS = 30
+
+EPOCH = pd.Timestamp("1970-01-01")
+
+# -------------------------
+# 2. Chunk sources
+# -------------------------
+def csv_chunks(path, chunk_rows):
+    """Stream the merged CSV, reading only the key and feature columns."""
+    wanted = {"cafe_place_id", "date", *FEATURES}
+    reader = pd.read_csv(path, usecols=lambda c: c in wanted, chunksize=chunk_rows)
+    for chunk in reader:
+        chunk = chunk.rename(columns={"cafe_place_id": "cafe_id"})
+        chunk["date"] = pd.to_datetime(chunk["date"])
+        yield chunk.reindex(columns=["cafe_id", "date", *FEATURES])
+
+
+def store_chunks(path, chunk_rows):
+    for chunk in iter_store_chunks(path, chunk_rows=chunk_rows, columns=FEATURES):
+        chunk["cafe_id"] = chunk["cafe_id"].astype(str)
+        yield chunk
+
+# -------------------------
+# 3. Streaming profile
+# -------------------------
+class Profile:
+    """
+    Running aggregates over cafe-day chunks. All state is sized by
+    cafes × months, never by the number of rows.
+    """
+
+    def __init__(self):
+        self.n_rows = 0
+        self.coverage = None    # (cafe_id, month) -> row count + non-null count per feature
+        self.per_cafe = None    # cafe_id -> rows, first/last date, last valid date per feature
+        self.ranges = {f: {"min": None, "max": None, "out_of_range": 0} for f in FEATURES}
+
+    def update(self, chunk):
+        self.n_rows += len(chunk)
+        valid = chunk[FEATURES].notna()
+
+        # Coverage matrix: rows and non-null counts per cafe and month
+        keys = [chunk["cafe_id"], chunk["date"].dt.to_period("M").astype(str).rename("month")]
+        counts = valid.groupby(keys).sum()
+        counts.insert(0, "rows", chunk.groupby(keys).size())
+        self.coverage = counts if self.coverage is None else self.coverage.add(counts, fill_value=0)
+
+        # Row-count consistency and staleness per cafe, dates as days since epoch
+        day = (chunk["date"] - EPOCH).dt.days
+        last_valid = valid.mul(day, axis=0).where(valid)
+        per_cafe = last_valid.groupby(chunk["cafe_id"]).max().add_prefix("last_")
+        grouped = day.groupby(chunk["cafe_id"])
+        per_cafe["rows"] = grouped.size()
+        per_cafe["first_date"] = grouped.min()
+        per_cafe["last_date"] = grouped.max()
+        if self.per_cafe is None:
+            self.per_cafe = per_cafe
+        else:
+            both = pd.concat([self.per_cafe, per_cafe])
+            agg = {c: "max" for c in per_cafe.columns}
+            agg.update(rows="sum", first_date="min")
+            self.per_cafe = both.groupby(level=0).agg(agg)
+
+        # Value ranges
+        for feature, (low, high) in EXPECTED_RANGES.items():
+            values = chunk[feature].dropna()
+            if values.empty:
+                continue
+            r = self.ranges[feature]
+            r["min"] = float(values.min()) if r["min"] is None else min(r["min"], float(values.min()))
+            r["max"] = float(values.max()) if r["max"] is None else max(r["max"], float(values.max()))
+            r["out_of_range"] += int(((values < low) | (values > high)).sum())
+
+    def report(self):
+        coverage = self.coverage
+        missing = 1 - coverage[FEATURES].div(coverage["rows"], axis=0)
+
+        per_cafe = self.per_cafe
+        to_date = lambda days: (EPOCH + pd.to_timedelta(days, unit="D")).strftime("%Y-%m-%d")
+        dataset_end = per_cafe["last_date"].max()
+        expected_days = per_cafe["last_date"] - per_cafe["first_date"] + 1
+        inconsistent = per_cafe[per_cafe["rows"] != expected_days]
+
+        staleness = {}
+        for feature in FEATURES:
+            last = per_cafe[f"last_{feature}"]
+            # Days between the cafe's latest valid value and the end of the data (NaN = never valid)
+            stale_days = dataset_end - last
+            stale = stale_days[stale_days.isna() | (stale_days > STALE_AFTER_DAYS)]
+            staleness[feature] = {
+                "stale_cafes": {cafe: (None if pd.isna(d) else int(d)) for cafe, d in stale.items()},
+                "last_valid_date": {cafe: to_date(d) for cafe, d in last.dropna().items()},
+            }
+
+        totals = coverage.groupby(level=0).sum()
+        return {
+            "n_rows": self.n_rows,
+            "n_cafes": len(per_cafe),
+            "date_range": [to_date(per_cafe["first_date"].min()), to_date(dataset_end)],
+            "missing_rate": {f: round(float(1 - totals[f].sum() / totals["rows"].sum()), 4) for f in FEATURES},
+            "coverage_missing_rate": {
+                f: missing[f].unstack("month").round(3).to_dict(orient="index") for f in FEATURES
+            },
+            "value_ranges": self.ranges,
+            "staleness": staleness,
+            "row_counts": {
+                "rows_per_cafe": per_cafe["rows"].astype(int).to_dict(),
+                "non_null_per_source": {f: int(totals[f].sum()) for f in FEATURES},
+                "cafes_without_data": {f: totals.index[totals[f] == 0].tolist() for f in FEATURES},
+                "cafes_with_gaps_or_duplicates": inconsistent.index.tolist(),
+            },
+        }
+
+# -------------------------
+# 4. HTML rendering
+# -------------------------
+def render_html(report):
+    """One summary table plus a cafe × month missing-rate table per feature."""
+    parts = ["<html><head><meta charset='utf-8'><title>Feature profile</title></head><body>",
+             f"<h1>Feature profile</h1><p>{report['n_rows']} rows, {report['n_cafes']} cafes, "
+             f"{report['date_range'][0]} – {report['date_range'][1]}</p>"]
+
+    summary = pd.DataFrame({
+        "missing_rate": report["missing_rate"],
+        "min": {f: r["min"] for f, r in report["value_ranges"].items()},
+        "max": {f: r["max"] for f, r in report["value_ranges"].items()},
+        "out_of_range": {f: r["out_of_range"] for f, r in report["value_ranges"].items()},
+        "stale_cafes": {f: len(s["stale_cafes"]) for f, s in report["staleness"].items()},
+    })
+    parts.append(summary.to_html())
+
+    for feature, matrix in report["coverage_missing_rate"].items():
+        parts.append(f"<h2>{feature}: missing rate by cafe and month</h2>")
+        parts.append(pd.DataFrame.from_dict(matrix, orient="index").to_html(float_format="{:.0%}".format))
+
+    parts.append("</body></html>")
+    return "\n".join(parts)
+
+# -------------------------
+# 5. CLI
+# -------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Profile data quality of the daily feature sources.")
+    sub = parser.add_subparsers(dest="source", required=True)
+    for name, default in (("csv", INPUT_CSV), ("store", STORE_DIR)):
+        p = sub.add_parser(name, help=f"profile the merged {'CSV' if name == 'csv' else 'feature store'}")
+        p.add_argument("--path", type=Path, default=default)
+        p.add_argument("--chunk-rows", type=int, default=500_000)
+        p.add_argument("--output", type=Path, default=OUTPUT_JSON)
+        p.add_argument("--html", type=Path, help="also write an HTML report here")
+    args = parser.parse_args(argv)
+
+    chunks = csv_chunks if args.source == "csv" else store_chunks
+    start = time.perf_counter()
+    profile = Profile()
+    for chunk in chunks(args.path, args.chunk_rows):
+        profile.update(chunk)
+    report = profile.report()
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=1, default=str))
+    if args.html:
+        args.html.write_text(render_html(report), encoding="utf-8")
+
+    print(f"Profiled {report['n_rows']} rows for {report['n_cafes']} cafes in {time.perf_counter() - start:.2f}s")
+    for feature, rate in report["missing_rate"].items():
+        print(f"   {feature:<16} missing {rate:6.1%}, stale cafes: {len(report['staleness'][feature]['stale_cafes'])}")
+    print(f"✅ Saved profile report to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,8 @@ import geopandas as gpd
 import pandas as pd
 from pathlib import Path
 from datetime import timedelta, datetime
+from cafe_registry import load_registry
+from ee_scheduler import evaluate_all
 
 # -------------------------
 # 1. Initialize GEE
@@ -21,26 +23,26 @@ except Exception:
 INPUT_GPKG = Path("data/processed/lap_locations.gpkg")
 OUTPUT_GPKG = Path("data/processed/lap_locations_pm25_daily.gpkg")
 
-# Assuming 'lap_coffee' layer exists and contains point geometries
-gdf = gpd.read_file(INPUT_GPKG, layer="lap_coffee")
-
-# Deduplicate by address before processing to prevent redundant API calls and data duplication
-print(f"Loaded {gdf.shape[0]} cafe locations. Deduplicating by address...")
-gdf.drop_duplicates(subset=['address'], keep='first', inplace=True)
-print(f"Processing {gdf.shape[0]} unique cafe locations after deduplication.")
+# The registry is already deduplicated, so no redundant API calls are made
+gdf = load_registry(INPUT_GPKG)
 
 
 START_DATE = "2025-01-01"
 END_DATE = "2025-10-24"
 
+# Maximum number of Earth Engine requests evaluated at the same time
+MAX_IN_FLIGHT = 8
+
 # ----------------------------------------------------
 # 3. Helper: calculate PM2.5 for a point and day
 #    Uses temporal smoothing (a window) to mitigate cloud cover gaps.
 # ----------------------------------------------------
 def get_daily_pm25(lat, lon, date_str, temporal_window_days=3):
     """
-    Fetches MODIS AOD data as a proxy for PM2.5, using a temporal window
+    Builds the MODIS AOD query (a proxy for PM2.5), using a temporal window
     to average data around the target date to fill cloud-related gaps.
+    Returns the unevaluated reduceRegion dictionary; evaluation is batched
+    through the scheduler.
     """
     AOD_BAND = 'Optical_Depth_055'
     SCALE_FACTOR = 0.001
@@ -73,40 +75,41 @@ def get_daily_pm25(lat, lon, date_str, temporal_window_days=3):
     point = ee.Geometry.Point([lon, lat])
     
     # NOTE: MODIS AOD resolution is 10000m (10km), so we set the scale to 10000.
-    try:
-        val = mean_aod_img.reduceRegion(
-            reducer=ee.Reducer.mean(),
-            geometry=point,
-            scale=10000 # Use the sensor's native resolution for accuracy
-        ).getInfo()
-        
-        return val.get('AOD')
-    except Exception as e:
-        # print(f"Error fetching AOD for {date_str}: {e}")
-        return None
+    return mean_aod_img.reduceRegion(
+        reducer=ee.Reducer.mean(),
+        geometry=point,
+        scale=10000 # Use the sensor's native resolution for accuracy
+    )
 
 # -------------------------
 # 4. Collect daily PM2.5 (AOD) for all cafés
 # -------------------------
 all_data = []
+computations = []
 dates = pd.date_range(START_DATE, END_DATE)
 
 for i, row in gdf.iterrows():
     lat, lon = row.geometry.y, row.geometry.x
-    print(f"📍 {row['name']} ({lat:.5f}, {lon:.5f}) - Processing {len(dates)} days...")
+    print(f"📍 {row['name']} ({lat:.5f}, {lon:.5f}) - Queuing {len(dates)} days...")
 
     for d in dates:
         # Call the function with the 3-day window for gap-filling
-        pm25_proxy_val = get_daily_pm25(lat, lon, d.strftime('%Y-%m-%d'), temporal_window_days=3)
+        computations.append(get_daily_pm25(lat, lon, d.strftime('%Y-%m-%d'), temporal_window_days=3))
         all_data.append({
+            "cafe_id": row["cafe_id"],
             "name": row["name"],
             "address": row["address"],
             "lat": lat,
             "lon": lon,
             "date": d.strftime('%Y-%m-%d'),
-            "pm25_aod_proxy": pm25_proxy_val
+            "pm25_aod_proxy": None
         })
 
+# Evaluate all queries concurrently; results come back in submission order
+print(f"Evaluating {len(computations)} Earth Engine requests ({MAX_IN_FLIGHT} in flight)...")
+for record, val in zip(all_data, evaluate_all(computations, max_in_flight=MAX_IN_FLIGHT)):
+    record["pm25_aod_proxy"] = val.get('AOD') if val else None
+
 # -------------------------
 # 5. Convert to GeoDataFrame and save
 # -------------------------
@@ -0,0 +1,79 @@
+# src/features/add_cafe_neighbours.py
+
+import time
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from scipy.spatial import cKDTree
+from cafe_registry import load_registry
+
+# -------------------------
+# 1. Input / Output
+# -------------------------
+INPUT_GPKG = Path("data/processed/lap_locations.gpkg")
+OUTPUT_GPKG = Path("data/processed/lap_locations_with_neighbours.gpkg")
+
+# Walking distance used for the density counts (in meters)
+RADIUS_M = 500
+EARTH_RADIUS_M = 6_371_008.8
+
+# -------------------------
+# 2. Helper: neighbour features for all venues at once
+# -------------------------
+def unit_vectors(gdf):
+    """Lat/lon as 3D points on the unit sphere, so a euclidean KD-tree works worldwide."""
+    lat = np.radians(gdf.geometry.y.to_numpy())
+    lon = np.radians(gdf.geometry.x.to_numpy())
+    return np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+
+def neighbour_features(gdf, radius_m=RADIUS_M):
+    """
+    Nearest-sibling distance and radius counts for every venue in bulk.
+
+    Venues sharing a (normalized) name are siblings of the same brand; all
+    other venues count as competitors. Points are placed on the unit sphere,
+    where the straight-line (chord) distance grows monotonically with the
+    great-circle distance, so KD-tree radius queries are exact. Radius counts
+    come from a single pair query on a shared tree, so the cost does not grow
+    with the number of brands; only chains (brands with 2+ venues) get their
+    own tree for the nearest-sibling lookup.
+    """
+    xyz = unit_vectors(gdf)
+    chord = 2 * np.sin(radius_m / EARTH_RADIUS_M / 2)
+    brand, _ = pd.factorize(gdf["name"].fillna("").str.strip().str.upper())
+    n = len(gdf)
+
+    # Every pair of venues within the radius, each pair listed once (i < j)
+    i, j = cKDTree(xyz).query_pairs(chord, output_type="ndarray").T
+    all_counts = np.bincount(i, minlength=n) + np.bincount(j, minlength=n)
+    same_brand = brand[i] == brand[j]
+    sibling_counts = np.bincount(i[same_brand], minlength=n) + np.bincount(j[same_brand], minlength=n)
+
+    nearest_sibling_m = np.full(n, np.nan)
+    for code in np.flatnonzero(np.bincount(brand) > 1):
+        idx = np.flatnonzero(brand == code)
+        # k=2 because the closest hit is always the venue itself
+        dist, _ = cKDTree(xyz[idx]).query(xyz[idx], k=2)
+        nearest_sibling_m[idx] = 2 * EARTH_RADIUS_M * np.arcsin(np.minimum(dist[:, 1] / 2, 1.0))
+
+    return pd.DataFrame({
+        "nearest_sibling_m": nearest_sibling_m.round(1),
+        f"siblings_count_{radius_m}m": sibling_counts,
+        f"competitors_count_{radius_m}m": all_counts - sibling_counts,
+    }, index=gdf.index)
+
+
+# -------------------------
+# 3. Compute and save
+# -------------------------
+if __name__ == "__main__":
+    gdf = load_registry(INPUT_GPKG)
+
+    start = time.perf_counter()
+    features = neighbour_features(gdf)
+    print(f"Computed neighbour features for {len(gdf)} venues in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    gdf_final = gdf.join(features)
+    gdf_final.to_file(OUTPUT_GPKG, layer="lap_coffee", driver="GPKG")
+    print(f"✅ Saved GeoPackage with neighbour features ({RADIUS_M} m radius): {OUTPUT_GPKG}")
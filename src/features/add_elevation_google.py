@@ -1,31 +1,38 @@
 import requests
-import geopandas as gpd
+import pandas as pd
 from pathlib import Path
 import time
+from cafe_registry import load_registry, pending_cafes, merge_static
 
 # Paths
 INPUT_GPKG = Path("data/processed/lap_locations.gpkg")
 OUTPUT_GPKG = Path("data/processed/lap_locations_elevation.gpkg")
 
-# Load points
-gdf = gpd.read_file(INPUT_GPKG, layer="lap_coffee")
+# Load points and skip cafes whose elevation is already known
+gdf = load_registry(INPUT_GPKG)
+pending, cached = pending_cafes(gdf, OUTPUT_GPKG, ["elevation_m"])
 
-# Function to get elevation
+# Function to get elevation; None on a failed lookup so it is stored as NaN and retried next run
 def get_elevation(lat, lon):
     url = f"https://api.open-elevation.com/api/v1/lookup?locations={lat},{lon}"
-    res = requests.get(url).json()
-    return res['results'][0]['elevation']
+    try:
+        res = requests.get(url).json()
+        return res['results'][0]['elevation']
+    except (requests.RequestException, ValueError, KeyError, IndexError) as e:
+        print(f"❌ Elevation lookup failed for {lat}, {lon}: {e}")
+        return None
 
 # Fetch elevations
 elevations = []
-for i, row in gdf.iterrows():
+for i, row in pending.iterrows():
     lat, lon = row.geometry.y, row.geometry.x
     elev = get_elevation(lat, lon)
     elevations.append(elev)
     print(f"{row['name']}: elevation = {elev} m")
     time.sleep(0.1)  # polite delay
 
-gdf['elevation_m'] = elevations
+computed = pd.DataFrame({"elevation_m": elevations}, index=pd.Index(pending["cafe_id"], name="cafe_id"))
+gdf = merge_static(gdf, cached, computed)
 
 # Save updated GeoPackage
 gdf.to_file(OUTPUT_GPKG, layer="lap_coffee", driver="GPKG")
@@ -3,6 +3,9 @@ import geopandas as gpd
 import pandas as pd
 from pathlib import Path
 from datetime import timedelta, datetime
+from cafe_registry import load_registry
+from ee_scheduler import evaluate_all
+from ndvi_windows import windows_to_daily
 
 # -------------------------
 # 1. Initialize GEE
@@ -19,11 +22,25 @@ except Exception:
 INPUT_GPKG = Path("data/processed/lap_locations.gpkg")
 OUTPUT_GPKG = Path("data/processed/lap_locations_ndvi_daily.gpkg")
 
-gdf = gpd.read_file(INPUT_GPKG, layer="lap_coffee")
+gdf = load_registry(INPUT_GPKG)
 
 START_DATE = "2025-01-01"
 END_DATE = "2025-10-24"
 
+# Maximum number of Earth Engine requests evaluated at the same time
+MAX_IN_FLIGHT = 8
+
+# "composite": one cloud-masked composite per window for all cafés at once,
+#              then filled to daily resolution locally.
+# "daily":     the original one-request-per-café-per-day query.
+NDVI_MODE = "composite"
+WINDOW_DAYS = 10
+NDVI_FILL = "interpolate"  # or "ffill": hold each composite until the next one
+
+# Sentinel-2 SCL classes masked per pixel: no data, saturated/defective, cloud shadow,
+# cloud medium/high probability, cirrus, snow/ice
+SCL_CLOUD_CLASSES = [0, 1, 3, 8, 9, 10, 11]
+
 # -------------------------
 # 3. Helper: calculate NDVI for a point and day
 # -------------------------
@@ -44,41 +61,110 @@ def get_daily_ndvi(lat, lon, date):
     mean_ndvi_img = ndvi_collection.mean()
 
     point = ee.Geometry.Point([lon, lat])
-    try:
-        val = mean_ndvi_img.reduceRegion(
-            reducer=ee.Reducer.mean(),
-            geometry=point,
-            scale=10
-        ).getInfo()
-        return val.get('NDVI')
-    except Exception:
-        return None
+    return mean_ndvi_img.reduceRegion(
+        reducer=ee.Reducer.mean(),
+        geometry=point,
+        scale=10
+    )
 
 # -------------------------
-# 4. Collect daily NDVI for all cafés
+# 4. Helper: cloud-masked NDVI composite for all cafés over one window
+# -------------------------
+def mask_s2_clouds(img):
+    """Mask cloud, shadow, snow and invalid pixels using the scene classification (SCL) band."""
+    scl = img.select('SCL')
+    clear = scl.neq(SCL_CLOUD_CLASSES[0])
+    for cls in SCL_CLOUD_CLASSES[1:]:
+        clear = clear.And(scl.neq(cls))
+    return img.updateMask(clear)
+
+
+def get_window_ndvi(cafes_fc, start, end):
+    """
+    Median NDVI of all cloud-masked Sentinel-2 scenes in [start, end), sampled
+    at every café in a single reduceRegions call. Partly cloudy scenes still
+    contribute their clear pixels, unlike the whole-scene filter of the daily mode.
+    """
+    collection = (ee.ImageCollection("COPERNICUS/S2_SR_HARMONIZED")
+                  .filterDate(start, end)
+                  .filterBounds(cafes_fc.geometry())
+                  .map(mask_s2_clouds)
+                  .map(lambda img: img.normalizedDifference(['B8', 'B4']).rename('NDVI')))
+
+    return collection.median().reduceRegions(
+        collection=cafes_fc,
+        reducer=ee.Reducer.mean().setOutputs(['NDVI']),
+        scale=10
+    )
+
+# -------------------------
+# 5. Collect daily NDVI for all cafés
 # -------------------------
-all_data = []
 dates = pd.date_range(START_DATE, END_DATE)
 
-for i, row in gdf.iterrows():
-    lat, lon = row.geometry.y, row.geometry.x
-    print(f"📍 {row['name']} ({lat:.5f}, {lon:.5f})")
-
-    for d in dates:
-        ndvi_val = get_daily_ndvi(lat, lon, d.strftime('%Y-%m-%d'))
-        all_data.append({
-            "name": row["name"],
-            "address": row["address"],
-            "lat": lat,
-            "lon": lon,
-            "date": d.strftime('%Y-%m-%d'),
-            "ndvi": ndvi_val
-        })
+if NDVI_MODE == "daily":
+    all_data = []
+    computations = []
+
+    for i, row in gdf.iterrows():
+        lat, lon = row.geometry.y, row.geometry.x
+        print(f"📍 {row['name']} ({lat:.5f}, {lon:.5f})")
+
+        for d in dates:
+            computations.append(get_daily_ndvi(lat, lon, d.strftime('%Y-%m-%d')))
+            all_data.append({
+                "cafe_id": row["cafe_id"],
+                "name": row["name"],
+                "address": row["address"],
+                "lat": lat,
+                "lon": lon,
+                "date": d.strftime('%Y-%m-%d'),
+                "ndvi": None
+            })
+
+    # Evaluate all queries concurrently; results come back in submission order
+    print(f"Evaluating {len(computations)} Earth Engine requests ({MAX_IN_FLIGHT} in flight)...")
+    for record, val in zip(all_data, evaluate_all(computations, max_in_flight=MAX_IN_FLIGHT)):
+        record["ndvi"] = val.get('NDVI') if val else None
+
+    df = pd.DataFrame(all_data)
+
+else:
+    cafes_fc = ee.FeatureCollection([
+        ee.Feature(ee.Geometry.Point([row.geometry.x, row.geometry.y]), {"cafe_id": row["cafe_id"]})
+        for _, row in gdf.iterrows()
+    ])
+    windows = pd.date_range(START_DATE, END_DATE, freq=f"{WINDOW_DAYS}D")
+    computations = [
+        get_window_ndvi(cafes_fc, w.strftime('%Y-%m-%d'), (w + pd.Timedelta(days=WINDOW_DAYS)).strftime('%Y-%m-%d'))
+        for w in windows
+    ]
+
+    # One request per window instead of one per café per day
+    print(f"Evaluating {len(computations)} {WINDOW_DAYS}-day composites for {len(gdf)} cafés ({MAX_IN_FLIGHT} in flight)...")
+    records = []
+    for w, result in zip(windows, evaluate_all(computations, max_in_flight=MAX_IN_FLIGHT)):
+        for feature in (result or {}).get("features", []):
+            props = feature["properties"]
+            records.append({"window": w, "cafe_id": props["cafe_id"], "ndvi": props.get("NDVI")})
+
+    window_values = (pd.DataFrame(records, columns=["window", "cafe_id", "ndvi"])
+                       .pivot(index="window", columns="cafe_id", values="ndvi")
+                       .reindex(index=windows, columns=gdf["cafe_id"])
+                       .astype(float))
+    daily = windows_to_daily(window_values, dates, WINDOW_DAYS, NDVI_FILL)
+
+    # Long format, one row per café and day, in the same layout as the daily mode
+    df = (daily.rename_axis("date").rename_axis(columns="cafe_id")
+               .unstack().rename("ndvi").reset_index())
+    cafes = gdf[["cafe_id", "name", "address"]].assign(lat=gdf.geometry.y, lon=gdf.geometry.x)
+    df = cafes.merge(df, on="cafe_id", how="right")
+    df["date"] = df["date"].dt.strftime('%Y-%m-%d')
+    print(f"NDVI available for {df['ndvi'].notna().mean():.0%} of café-days")
 
 # -------------------------
-# 5. Convert to GeoDataFrame and save
+# 6. Convert to GeoDataFrame and save
 # -------------------------
-df = pd.DataFrame(all_data)
 gdf_out = gpd.GeoDataFrame(
     df,
     geometry=gpd.points_from_xy(df.lon, df.lat),
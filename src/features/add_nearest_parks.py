@@ -1,6 +1,6 @@
 import os
 import requests
-import geopandas as gpd
+import numpy as np
 import pandas as pd
 from pathlib import Path
 from shapely.geometry import Point
@@ -9,6 +9,7 @@ import time
 import math
 import sys
 import json
+from cafe_registry import load_registry, pending_cafes, merge_static
 
 # -------------------------
 # 1. Configuration and API Key
@@ -31,35 +32,19 @@ INPUT_GPKG = Path("data/processed/lap_locations.gpkg")
 OUTPUT_GPKG = Path("data/processed/lap_locations_with_park_counts.gpkg") 
 
 try:
-    gdf = gpd.read_file(INPUT_GPKG, layer="lap_coffee")
+    gdf = load_registry(INPUT_GPKG)
 except Exception as e:
     sys.exit(f"❌ Error reading input file {INPUT_GPKG}: {e}. Ensure the file exists.")
 
-print(f"Loaded {len(gdf)} initial cafe locations.")
+# --- CHANGE DETECTION: only cafes that are new or moved since the last run are queried ---
+pending, cached = pending_cafes(gdf, OUTPUT_GPKG, ["parks_count_1km"])
 
-# --- DEDUPLICATION STEP (FIXED): Ensure only unique cafe coordinates are processed ---
-initial_count = len(gdf)
-
-# Create a temporary column with the WKT string for stable subset naming
-gdf['_wkt_temp'] = gdf.geometry.to_wkt()
-# Drop duplicates based on the temporary WKT column
-gdf.drop_duplicates(subset=['_wkt_temp'], keep='first', inplace=True)
-# Remove the temporary column immediately
-gdf.drop(columns=['_wkt_temp'], inplace=True)
-
-final_count = len(gdf)
-
-if initial_count != final_count:
-    print(f"⚠️ Removed {initial_count - final_count} duplicate cafe locations based on coordinates.")
-else:
-    print("✅ No duplicate cafe locations found based on coordinates.")
-
-print(f"Processing {final_count} unique cafe locations.")
+print(f"Processing {len(pending)} new or changed cafe locations.")
 # -------------------------
 # 3. Fetch nearby parks (Places API) - Updated to return all parks found
 # -------------------------
 def fetch_nearby_parks(lat, lon, radius=RADIUS_M):
-    """Fetch all nearby parks within the specified radius using Google Places API."""
+    """Fetch all nearby parks within the specified radius using Google Places API. Returns None if the API call fails."""
     url = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
     parks = []
     params = {
@@ -79,7 +64,7 @@ def fetch_nearby_parks(lat, lon, radius=RADIUS_M):
         
         if res.get("status") not in ("OK", "ZERO_RESULTS"):
             print(f"❌ Places API Error: {res.get('status')} for location {lat}, {lon}")
-            return []
+            return None
 
         for place in res.get("results", []):
             # We only need the name here, but including location details can be useful for debugging
@@ -103,41 +88,31 @@ def fetch_nearby_parks(lat, lon, radius=RADIUS_M):
 # -------------------------
 park_counts = []
 
-for idx, row in gdf.iterrows():
+for idx, row in pending.iterrows():
     cafe_name = row["name"]
     cafe_lat, cafe_lon = row.geometry.y, row.geometry.x
     
     # Use the working Places API to find nearby parks
     parks_list = fetch_nearby_parks(cafe_lat, cafe_lon)
     
-    park_count = len(parks_list)
+    # A failed lookup is stored as NaN (not 0) so it is retried on the next run
+    park_count = np.nan if parks_list is None else len(parks_list)
     
     print(f"\n☕ Processing: {cafe_name} ({cafe_lat:.5f}, {cafe_lon:.5f})")
     print(f"   🌳 Found {park_count} parks within {RADIUS_M/1000} km radius.")
 
     park_counts.append({
-        "name": cafe_name,
+        "cafe_id": row["cafe_id"],
         "parks_count_1km": park_count,
     })
 
 # -------------------------
 # 5. Merge park counts into main GeoDataFrame and Save
 # -------------------------
-counts_df = pd.DataFrame(park_counts) 
-
-# Merge using index to align the new count data correctly with the GeoDataFrame
-gdf_final = gdf.copy()
-# Ensure index is consistent for join
-counts_df.set_index(gdf_final.index, inplace=True)
-
-# Drop old columns (if they exist from a previous run) and join the new count column
-columns_to_drop = ['park_name', 'park_lat', 'park_lon', 'distance_to_park_m', 'park_geometry']
-for col in columns_to_drop:
-    if col in gdf_final.columns:
-        gdf_final = gdf_final.drop(columns=[col])
+counts_df = pd.DataFrame(park_counts, columns=["cafe_id", "parks_count_1km"]).set_index("cafe_id")
 
-# Join the new parks count
-gdf_final = gdf_final.join(counts_df[['parks_count_1km']])
+# Combine cached counts for unchanged cafes with the fresh ones, keyed by cafe_id
+gdf_final = merge_static(gdf, cached, counts_df)
 
 # -------------------------
 # 6. Save GeoPackage
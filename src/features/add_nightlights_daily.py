@@ -2,6 +2,8 @@ import ee
 import geopandas as gpd
 import pandas as pd
 from pathlib import Path
+from cafe_registry import load_registry
+from ee_scheduler import evaluate_all
 
 # -------------------------
 # 1. Initialize GEE
@@ -18,11 +20,14 @@ except Exception:
 INPUT_GPKG = Path("data/processed/lap_locations.gpkg")
 OUTPUT_GPKG = Path("data/processed/lap_locations_nightlights_daily.gpkg")
 
-gdf = gpd.read_file(INPUT_GPKG, layer="lap_coffee")
+gdf = load_registry(INPUT_GPKG)
 
 START_DATE = "2025-01-01"
 END_DATE = "2025-10-24"
 
+# Maximum number of Earth Engine requests evaluated at the same time
+MAX_IN_FLIGHT = 8
+
 # -------------------------
 # 3. Helper: get monthly nightlights
 # -------------------------
@@ -38,20 +43,17 @@ def get_monthly_nightlights(lat, lon, date):
     mean_img = collection.mean()
     point = ee.Geometry.Point([lon, lat])
 
-    try:
-        val = mean_img.reduceRegion(
-            reducer=ee.Reducer.mean(),
-            geometry=point,
-            scale=500
-        ).getInfo()
-        return val.get('avg_rad')
-    except Exception:
-        return None
+    return mean_img.reduceRegion(
+        reducer=ee.Reducer.mean(),
+        geometry=point,
+        scale=500
+    )
 
 # -------------------------
 # 4. Collect nightlights for all cafés
 # -------------------------
 all_data = []
+computations = []
 dates = pd.date_range(START_DATE, END_DATE)
 
 for i, row in gdf.iterrows():
@@ -59,16 +61,22 @@ for i, row in gdf.iterrows():
     print(f"📍 {row['name']} ({lat:.5f}, {lon:.5f})")
 
     for d in dates:
-        nl_val = get_monthly_nightlights(lat, lon, d)
+        computations.append(get_monthly_nightlights(lat, lon, d))
         all_data.append({
+            "cafe_id": row["cafe_id"],
             "name": row["name"],
             "address": row["address"],
             "lat": lat,
             "lon": lon,
             "date": d.strftime('%Y-%m-%d'),
-            "nightlight": nl_val
+            "nightlight": None
         })
 
+# Evaluate all queries concurrently; results come back in submission order
+print(f"Evaluating {len(computations)} Earth Engine requests ({MAX_IN_FLIGHT} in flight)...")
+for record, val in zip(all_data, evaluate_all(computations, max_in_flight=MAX_IN_FLIGHT)):
+    record["nightlight"] = val.get('avg_rad') if val else None
+
 # -------------------------
 # 5. Convert to GeoDataFrame and save
 # -------------------------
@@ -1,12 +1,13 @@
 import os
 import requests
-import geopandas as gpd
+import numpy as np
 import pandas as pd
 from pathlib import Path
 from dotenv import load_dotenv
 import sys
 import time
 import json 
+from cafe_registry import load_registry, pending_cafes, merge_static
 
 # Define the radius for searching (in meters)
 RADIUS_M = 500 
@@ -28,33 +29,14 @@ INPUT_GPKG = Path("data/processed/lap_locations.gpkg")
 OUTPUT_GPKG = Path("data/processed/lap_locations_with_open_bars.gpkg")
 
 try:
-    gdf = gpd.read_file(INPUT_GPKG, layer="lap_coffee")
+    gdf = load_registry(INPUT_GPKG)
 except Exception as e:
     sys.exit(f"❌ Error reading input file {INPUT_GPKG}: {e}. Ensure the file exists.")
 
-print(f"Loaded {len(gdf)} initial cafe locations.")
+# --- CHANGE DETECTION: only cafes that are new or moved since the last run are queried ---
+pending, cached = pending_cafes(gdf, OUTPUT_GPKG, ["open_bars_count_500m"])
 
-# --- DEDUPLICATION STEP 1: By Coordinates (Standard cleaning) ---
-initial_coord_count = len(gdf)
-gdf['_wkt_temp'] = gdf.geometry.to_wkt()
-gdf.drop_duplicates(subset=['_wkt_temp'], keep='first', inplace=True)
-gdf.drop(columns=['_wkt_temp'], inplace=True)
-mid_count = len(gdf)
-
-if initial_coord_count != mid_count:
-    print(f"⚠️ Removed {initial_coord_count - mid_count} duplicate cafe locations based on coordinates.")
-
-# --- DEDUPLICATION STEP 2 (FIX): By Address (To ensure 1 row per unique physical location, as requested) ---
-initial_address_count = len(gdf)
-gdf.drop_duplicates(subset=['address'], keep='first', inplace=True)
-final_count = len(gdf)
-
-if initial_address_count != final_count:
-    print(f"⚠️ Removed {initial_address_count - final_count} rows to ensure only one entry per unique cafe address.")
-else:
-    print("✅ Input cafes already have unique addresses.")
-
-print(f"Processing {final_count} unique cafe locations.")
+print(f"Processing {len(pending)} new or changed cafe locations.")
 
 
 # -------------------------
@@ -64,6 +46,7 @@ def fetch_nearby_open_bars(lat, lon, radius=RADIUS_M):
     """
     Fetch all nearby bars/pubs that are currently open within the specified radius.
     NOTE: Uses 'opennow=true' which returns bars open at the time the script is executed.
+    Returns None if the API call fails.
     """
     url = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
     params = {
@@ -84,7 +67,7 @@ def fetch_nearby_open_bars(lat, lon, radius=RADIUS_M):
         
         if res.get("status") not in ("OK", "ZERO_RESULTS"):
             print(f"❌ Places API Error: {res.get('status')} for location {lat}, {lon}")
-            return []
+            return None
 
         for place in res.get("results", []):
             all_bars.append({
@@ -104,11 +87,11 @@ def fetch_nearby_open_bars(lat, lon, radius=RADIUS_M):
 # -------------------------
 # 4. Main loop to count open bars
 # -------------------------
-# Initialize a list to hold the calculated counts, indexed by the original unique GeoDataFrame index
+# Initialize a list to hold the calculated counts, keyed by the registry cafe_id
 bar_counts_list = [] 
-indexes_processed = []
+cafe_ids_processed = []
 
-for i, row in gdf.iterrows():
+for i, row in pending.iterrows():
     cafe_name = row["name"]
     cafe_lat, cafe_lon = row.geometry.y, row.geometry.x
     
@@ -117,11 +100,11 @@ for i, row in gdf.iterrows():
     # Fetch all open bars in the 500m radius
     open_bars_list = fetch_nearby_open_bars(cafe_lat, cafe_lon)
     
-    # Total count for the density metric
-    open_bars_count_500m = len(open_bars_list)
+    # Total count for the density metric; NaN on a failed lookup so it is retried next run
+    open_bars_count_500m = np.nan if open_bars_list is None else len(open_bars_list)
     
     bar_counts_list.append(open_bars_count_500m)
-    indexes_processed.append(i)
+    cafe_ids_processed.append(row["cafe_id"])
     
     print(f"   🍺 Total Open Bars/Pubs in 500m: {open_bars_count_500m}.")
 
@@ -129,22 +112,14 @@ for i, row in gdf.iterrows():
 # 5. Add bar counts to the deduplicated GeoDataFrame and Save
 # -------------------------
 
-# Create a Series from the counts, indexed by the rows that were processed
-counts_series = pd.Series(bar_counts_list, index=indexes_processed, name="open_bars_count_500m")
-
-# Clean up old amenity columns (if they existed from a previous run)
-columns_to_drop = [
-    'nearest_toilet_name', 'nearest_toilet_lat', 'nearest_toilet_lon', 
-    'toilet_distance_m', 'toilets_count_500m', 
-    'park_name', 'park_lat', 'park_lon', 'distance_to_park_m', 'parks_count_1km',
-    'open_bars_count_500m' # drop existing column if present to ensure clean assignment
-]
-for col in columns_to_drop:
-    if col in gdf.columns:
-        gdf = gdf.drop(columns=[col])
-
-# Add the new count column directly to the GeoDataFrame
-gdf['open_bars_count_500m'] = counts_series
+# Create a frame from the counts, indexed by the cafes that were processed
+counts_df = pd.DataFrame(
+    {"open_bars_count_500m": bar_counts_list},
+    index=pd.Index(cafe_ids_processed, name="cafe_id"),
+)
+
+# Combine cached counts for unchanged cafes with the fresh ones
+gdf = merge_static(gdf, cached, counts_df)
 
 # -------------------------
 # 6. Save updated GeoPackage
@@ -5,6 +5,7 @@ import pandas as pd
 import requests
 from pathlib import Path
 from datetime import datetime, timedelta
+from cafe_registry import load_registry
 
 # -------------------------
 # 1. Input & output
@@ -12,8 +13,8 @@ from datetime import datetime, timedelta
 INPUT_GPKG = Path("data/processed/lap_locations.gpkg")
 OUTPUT_GPKG = Path("data/processed/lap_locations_historical_weather.gpkg")
 
-# Load LAP Coffee GeoPackage
-gdf = gpd.read_file(INPUT_GPKG, layer="lap_coffee")
+# Load LAP Coffee cafes from the shared registry
+gdf = load_registry(INPUT_GPKG)
 
 # -------------------------
 # 2. Function to determine season
@@ -70,6 +71,7 @@ for i, row in gdf.iterrows():
     weather_records = get_historical_weather(lat, lon, START_DATE, END_DATE)
     for record in weather_records:
         record.update({
+            "cafe_id": row["cafe_id"],
             "name": row["name"],
             "address": row["address"],
             "lat": lat,
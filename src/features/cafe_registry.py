@@ -0,0 +1,119 @@
+# src/features/cafe_registry.py
+
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+from pathlib import Path
+
+# -------------------------
+# 1. Registry configuration
+# -------------------------
+INPUT_GPKG = Path("data/processed/lap_locations.gpkg")
+LAYER = "lap_coffee"
+
+# Coordinates are snapped to 1e-6 degrees (~10 cm) before hashing, so float
+# noise from the CSV -> GPKG round trip never creates a "new" cafe.
+COORD_PRECISION = 6
+
+# Columns that identify a cafe's physical location. If any of them changes,
+# every static feature for that cafe has to be recomputed.
+FINGERPRINT_COLUMNS = ["_lat_key", "_lon_key", "address"]
+
+
+# -------------------------
+# 2. Vectorized coordinate hashing
+# -------------------------
+def coordinate_keys(gdf, precision=COORD_PRECISION):
+    """Return integer lat/lon keys snapped to the given number of decimals."""
+    scale = 10 ** precision
+    lat_key = np.round(gdf.geometry.y.to_numpy() * scale).astype(np.int64)
+    lon_key = np.round(gdf.geometry.x.to_numpy() * scale).astype(np.int64)
+    return lat_key, lon_key
+
+
+def fingerprint(df):
+    """Hash the location columns of each cafe into a stable hex string."""
+    hashes = pd.util.hash_pandas_object(df[FINGERPRINT_COLUMNS], index=False)
+    return hashes.map("{:016x}".format)
+
+
+# -------------------------
+# 3. Load the canonical registry
+# -------------------------
+def load_registry(path=INPUT_GPKG, layer=LAYER):
+    """
+    Load the cafe list once, deduplicated and keyed by Google place_id.
+
+    Every feature stage reads cafes through this function so all outputs share
+    the same row set and can be merged on `cafe_id` instead of float lat/lon.
+    """
+    gdf = gpd.read_file(path, layer=layer)
+    initial_count = len(gdf)
+
+    gdf["_lat_key"], gdf["_lon_key"] = coordinate_keys(gdf)
+
+    # Cafes without a place_id fall back to their coordinate key
+    coord_id = "coord:" + gdf["_lat_key"].astype(str) + "," + gdf["_lon_key"].astype(str)
+    gdf["cafe_id"] = gdf["place_id"].where(gdf["place_id"].notna(), coord_id)
+
+    gdf = gdf.drop_duplicates(subset=["cafe_id"], keep="first")
+    gdf = gdf.drop_duplicates(subset=["_lat_key", "_lon_key"], keep="first")
+
+    gdf["address"] = gdf["address"].fillna("")
+    gdf["fingerprint"] = fingerprint(gdf)
+    gdf = gdf.drop(columns=["_lat_key", "_lon_key"]).reset_index(drop=True)
+
+    if initial_count != len(gdf):
+        print(f"⚠️ Registry removed {initial_count - len(gdf)} duplicate cafe locations.")
+    print(f"Registry holds {len(gdf)} unique cafes.")
+    return gdf
+
+
+# -------------------------
+# 4. Change detection for static stages
+# -------------------------
+def pending_cafes(registry, output_path, value_columns, layer=LAYER):
+    """
+    Split the registry into cafes that need computing and cached results.
+
+    Returns `(pending, cached)`: `pending` is the subset of registry rows that
+    are new, whose fingerprint changed since `output_path` was written, or
+    whose stored values are missing (a failed lookup is saved as NaN so it is
+    retried on the next run); `cached` holds `value_columns` indexed by
+    `cafe_id` for the rest.
+    """
+    empty = pd.DataFrame({c: pd.Series(dtype="float64") for c in value_columns},
+                         index=pd.Index([], name="cafe_id"))
+    output_path = Path(output_path)
+    if not output_path.exists():
+        return registry, empty
+
+    previous = gpd.read_file(output_path, layer=layer)
+    required = {"cafe_id", "fingerprint", *value_columns}
+    if not required.issubset(previous.columns):
+        print(f"⚠️ {output_path} predates the cafe registry, recomputing all cafes.")
+        return registry, empty
+
+    previous = previous.drop_duplicates(subset=["cafe_id"]).set_index("cafe_id")
+    stored = previous.reindex(registry["cafe_id"])
+    unchanged = ((stored["fingerprint"].to_numpy() == registry["fingerprint"].to_numpy())
+                 & stored[value_columns].notna().all(axis=1).to_numpy())
+
+    pending = registry[~unchanged]
+    cached = previous.loc[registry.loc[unchanged, "cafe_id"], value_columns]
+    print(f"{len(pending)} of {len(registry)} cafes new or changed, reusing {len(cached)} cached results.")
+    return pending, cached
+
+
+def merge_static(registry, cached, computed):
+    """
+    Attach cached and freshly computed values (indexed by cafe_id) to the registry.
+
+    Values are coerced to numbers so an empty side of the concat (or a None
+    from a failed lookup) cannot turn a column into object dtype, which the
+    GeoPackage would otherwise store as text.
+    """
+    frames = [frame for frame in (cached, computed) if len(frame)]
+    values = pd.concat(frames) if frames else computed
+    values = values.apply(pd.to_numeric, errors="coerce")
+    return registry.join(values, on="cafe_id")
@@ -0,0 +1,107 @@
+# src/features/ee_scheduler.py
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# -------------------------
+# 1. Scheduler configuration
+# -------------------------
+# Earth Engine allows a limited number of concurrent interactive requests per
+# project; 8 stays comfortably below the default quota.
+MAX_IN_FLIGHT = 8
+MAX_RETRIES = 6
+BACKOFF_BASE_S = 1.0
+BACKOFF_CAP_S = 60.0
+
+# Substrings of Earth Engine error messages that mean "slow down", not "bad query"
+THROTTLE_MARKERS = (
+    "too many concurrent aggregations",
+    "too many requests",
+    "quota",
+    "rate limit",
+    "429",
+)
+
+
+def is_throttle_error(exc):
+    """True if the exception is Earth Engine asking us to back off."""
+    message = str(exc).lower()
+    return any(marker in message for marker in THROTTLE_MARKERS)
+
+
+# -------------------------
+# 2. Adaptive concurrency limit (AIMD)
+# -------------------------
+class AdaptiveLimiter:
+    """
+    Caps in-flight requests. The cap halves on throttling and grows back by
+    roughly one slot per round of successful requests.
+
+    A burst of throttled requests is one congestion signal, not many: each
+    `acquire()` returns the current epoch, and a throttle only halves the cap
+    if no decrease has happened since that request started.
+    """
+
+    def __init__(self, max_in_flight):
+        self.max_in_flight = max_in_flight
+        self.limit = float(max_in_flight)
+        self.in_flight = 0
+        self.epoch = 0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+            return self.epoch
+
+    def release(self, epoch, throttled=False):
+        with self._cond:
+            self.in_flight -= 1
+            if throttled:
+                if epoch == self.epoch:
+                    self.limit = max(1.0, self.limit / 2)
+                    self.epoch += 1
+            else:
+                self.limit = min(float(self.max_in_flight), self.limit + 1.0 / self.limit)
+            self._cond.notify_all()
+
+
+# -------------------------
+# 3. Evaluate many Earth Engine objects concurrently
+# -------------------------
+def evaluate_all(computations, max_in_flight=MAX_IN_FLIGHT, max_retries=MAX_RETRIES, default=None,
+                 backoff_base_s=BACKOFF_BASE_S, backoff_cap_s=BACKOFF_CAP_S):
+    """
+    Call `getInfo()` on every computation through a bounded thread pool.
+
+    Results come back in the same order as `computations`. Throttling errors
+    are retried with full-jitter exponential backoff; any other error (or
+    running out of retries) yields `default`, matching the per-call
+    `except Exception: return None` behaviour of the feature scripts. The
+    n-th retry sleeps up to `min(backoff_cap_s, backoff_base_s * 2**n)`.
+    """
+    limiter = AdaptiveLimiter(max_in_flight)
+
+    def evaluate(computation):
+        for attempt in range(max_retries + 1):
+            epoch = limiter.acquire()
+            try:
+                result = computation.getInfo()
+            except Exception as e:
+                throttled = is_throttle_error(e)
+                limiter.release(epoch, throttled)
+                if not throttled or attempt == max_retries:
+                    return default
+                time.sleep(random.uniform(0, min(backoff_cap_s, backoff_base_s * 2 ** attempt)))
+                continue
+            limiter.release(epoch)
+            return result
+        return default
+
+    with ThreadPoolExecutor(max_workers=max_in_flight) as pool:
+        return list(pool.map(evaluate, computations))
+
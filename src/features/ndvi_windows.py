@@ -0,0 +1,26 @@
+# src/features/ndvi_windows.py
+
+import pandas as pd
+
+
+def windows_to_daily(window_values, dates, window_days, fill="interpolate"):
+    """
+    Expand per-window NDVI (rows: window start date, columns: cafe_id) to one
+    row per day. "interpolate" anchors each composite at its window centre and
+    interpolates linearly in time; "ffill" holds it from the window start.
+
+    Fills are bounded so a single clear composite is never carried across a
+    long cloudy spell: interpolation reaches at most `window_days` from each
+    clear composite (bridging one missing window), and "ffill" holds a
+    composite only for its own window.
+    """
+    if fill == "interpolate":
+        half = window_days // 2
+        window_values = window_values.set_axis(window_values.index + pd.Timedelta(days=half))
+        daily = window_values.reindex(window_values.index.union(dates))
+        daily = daily.interpolate(method="time", limit=window_days, limit_direction="both", limit_area="inside")
+        # Edges only: the first composite also covers the half-window before its centre
+        daily = daily.bfill(limit=half, limit_area="outside").ffill(limit=window_days, limit_area="outside")
+    else:
+        daily = window_values.reindex(window_values.index.union(dates)).ffill(limit=window_days - 1)
+    return daily.reindex(dates)
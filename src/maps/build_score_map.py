@@ -0,0 +1,152 @@
+# src/maps/build_score_map.py
+
+import base64
+import json
+import sys
+import time
+import folium
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from branca.element import MacroElement
+from jinja2 import Template
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "warehouse"))
+from feature_store import STORE_DIR, load_store, read_schema
+
+# -------------------------
+# 1. Input / Output
+# -------------------------
+OUTPUT_DIR = Path("data/processed/maps")
+
+# Bump when the template or the score changes so cached maps are rebuilt
+MAP_VERSION = "2"
+
+MISSING = 255  # score byte used for cafe-days without a score
+
+# -------------------------
+# 2. Daily scores
+# -------------------------
+def daily_scores(cafes, daily):
+    """
+    Heuristic 0-100 "visit today" score per cafe-day: comfortable temperature,
+    little rain, clean air and the cafe's rating. Missing inputs count as
+    neutral (0.5) so a cloudy-day gap does not sink a cafe.
+    """
+    temp = 1 - (daily["temp_max"] - 22).abs().clip(upper=20) / 20
+    rain = 1 - daily["precip_mm"].clip(lower=0, upper=10) / 10
+    air = 1 - daily["pm25_aod_proxy"].clip(lower=0, upper=0.5) / 0.5
+    rating = ((cafes["cafe_rating"].reindex(daily["cafe_id"]).to_numpy() - 3) / 2).clip(0, 1)
+
+    parts = pd.DataFrame({"temp": temp, "rain": rain, "air": air, "rating": rating}).fillna(0.5)
+    return 100 * (0.35 * parts["temp"] + 0.30 * parts["rain"] + 0.15 * parts["air"] + 0.20 * parts["rating"])
+
+
+def score_matrix(cafes, daily, scores):
+    """
+    Scatter scores into a dense (days × cafes) uint8 array. Each cafe appears
+    once in the map; every day is just a row of bytes referencing it by position.
+    """
+    first_day = daily["date"].min()
+    day_idx = (daily["date"] - first_day).dt.days.to_numpy()
+    cafe_idx = daily["cafe_id"].cat.codes.to_numpy()
+
+    matrix = np.full((day_idx.max() + 1, len(cafes)), MISSING, dtype=np.uint8)
+    valid = scores.notna().to_numpy()
+    matrix[day_idx[valid], cafe_idx[valid]] = np.round(scores.to_numpy()[valid]).astype(np.uint8)
+    dates = pd.date_range(first_day, periods=len(matrix)).strftime("%Y-%m-%d").tolist()
+    return dates, matrix
+
+# -------------------------
+# 3. Map template
+# -------------------------
+SLIDER_JS = """
+(function () {
+    var map = %(map)s;
+    var cafes = %(cafes)s;
+    var dates = %(dates)s;
+    var scores = atob("%(scores)s");
+    var n = cafes.length;
+
+    function colour(s) {
+        return s === %(missing)d ? "#999999" : "hsl(" + Math.round(s * 1.2) + ", 70%%, 45%%)";
+    }
+
+    var markers = cafes.map(function (c) {
+        return L.circleMarker([c[1], c[2]], {radius: 8, weight: 1, color: "#333", fillOpacity: 0.85})
+            .bindTooltip("").addTo(map);
+    });
+
+    var control = L.control({position: "topright"});
+    control.onAdd = function () {
+        var div = L.DomUtil.create("div", "leaflet-bar");
+        div.style.background = "white";
+        div.style.padding = "6px";
+        div.innerHTML = '<b id="score-date"></b><br><input id="score-day" type="range" min="0" max="'
+            + (dates.length - 1) + '" value="' + (dates.length - 1) + '" style="width:240px">';
+        L.DomEvent.disableClickPropagation(div);
+        return div;
+    };
+    control.addTo(map);
+
+    function show(day) {
+        document.getElementById("score-date").textContent = dates[day];
+        for (var i = 0; i < n; i++) {
+            var s = scores.charCodeAt(day * n + i);
+            markers[i].setStyle({fillColor: colour(s)});
+            markers[i].setTooltipContent(cafes[i][0] + ": " + (s === %(missing)d ? "no data" : s));
+        }
+    }
+    var slider = document.getElementById("score-day");
+    slider.addEventListener("input", function () { show(+slider.value); });
+    show(dates.length - 1);
+})();
+"""
+
+
+class ScoreSlider(MacroElement):
+    """Renders the slider script as a child of the map, i.e. after the map exists."""
+
+    _template = Template("{% macro script(this, kwargs) %}{{ this.js }}{% endmacro %}")
+
+    def __init__(self, js):
+        super().__init__()
+        self._name = "ScoreSlider"
+        self.js = js
+
+
+def build_map(cafes, dates, matrix):
+    """One marker per cafe plus a day slider that recolours them from the shared score array."""
+    m = folium.Map(location=[cafes["lat"].mean(), cafes["lon"].mean()], zoom_start=12, tiles="OpenStreetMap")
+    labels = (cafes["name"].astype(str) + ", " + cafes["address"].astype(str).str.split(",").str[0])
+    cafe_rows = [[label, round(lat, 6), round(lon, 6)] for label, lat, lon in zip(labels, cafes["lat"], cafes["lon"])]
+
+    js = SLIDER_JS % {
+        "map": m.get_name(),
+        "cafes": json.dumps(cafe_rows, ensure_ascii=False),
+        "dates": json.dumps(dates),
+        "scores": base64.b64encode(np.ascontiguousarray(matrix).tobytes()).decode("ascii"),
+        "missing": MISSING,
+    }
+    m.add_child(ScoreSlider(js))
+    return m
+
+# -------------------------
+# 4. Build (cached by feature snapshot)
+# -------------------------
+if __name__ == "__main__":
+    start = time.perf_counter()
+    snapshot = read_schema(STORE_DIR)["snapshot_hash"][:16]
+    output_html = OUTPUT_DIR / f"lap_scores_{snapshot}_v{MAP_VERSION}.html"
+
+    if output_html.exists():
+        print(f"✅ Map for feature snapshot {snapshot} already built: {output_html}")
+    else:
+        cafes, daily = load_store(STORE_DIR, columns=["temp_max", "precip_mm", "pm25_aod_proxy"], with_season=False)
+        dates, matrix = score_matrix(cafes, daily, daily_scores(cafes, daily))
+
+        OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+        build_map(cafes, dates, matrix).save(str(output_html))
+        size_mb = output_html.stat().st_size / 1e6
+        print(f"Rendered {len(dates)} days × {len(cafes)} cafes in {time.perf_counter() - start:.2f}s ({size_mb:.2f} MB)")
+        print(f"✅ Saved score map to {output_html}")
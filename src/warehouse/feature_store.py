@@ -0,0 +1,199 @@
+# src/warehouse/feature_store.py
+
+import hashlib
+import json
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+# -------------------------
+# 1. Input / Output
+# -------------------------
+INPUT_CSV = Path("data/processed/lap_locations_final_merged.csv")
+STORE_DIR = Path("data/processed/lap_feature_store")
+
+# -------------------------
+# 2. Schema
+# -------------------------
+# Cafe dimension: one row per cafe, indexed by cafe_id (Google place_id).
+# Location and metadata live here only, never on the daily rows.
+CAFE_SCHEMA = {
+    "name": "category",
+    "address": "string",
+    "lat": "float64",                    # kept at full precision for mapping
+    "lon": "float64",
+    "cafe_rating": "float32",            # 1.0 - 5.0
+    "cafe_user_ratings_total": "Int32",
+    "elevation_m": "float32",
+    "parks_count_1km": "Int16",          # Places API caps results at 60
+    "open_bars_count_500m": "Int16",
+    "nearest_sibling_m": "float32",
+    "siblings_count_500m": "Int16",
+    "competitors_count_500m": "Int16",
+}
+
+# Daily facts: one row per (cafe, date). On disk `cafe_code` is an int16
+# position in the cafe dimension and `date` is int32 days since 1970-01-01;
+# in memory they load back as a categorical `cafe_id` and datetime64[ns] `date`.
+# `season` is not stored, it is derived from the date on load.
+DAILY_SCHEMA = {
+    "cafe_code": "int16",
+    "date": "int32",
+    "pm25_aod_proxy": "float32",         # MODIS AOD, ~0 - 5
+    "temp_max": "float32",               # °C
+    "temp_min": "float32",               # °C
+    "precip_mm": "float32",
+    "ndvi": "float32",                   # -1 - 1
+    "nightlight": "float32",             # VIIRS avg_rad
+}
+
+# In-memory resolution of `date`, fixed so frames compare equal across pandas versions
+DATE_DTYPE = "datetime64[ns]"
+MAX_CAFES = np.iinfo(DAILY_SCHEMA["cafe_code"]).max + 1
+
+SEASONS = ["Winter", "Spring", "Summer", "Autumn"]
+# Month (1-12) -> position in SEASONS; index 0 is unused
+_MONTH_TO_SEASON = np.array([0, 0, 0, 1, 1, 1, 2, 2, 2, 3, 3, 3, 0], dtype=np.int8)
+
+
+def season_from_date(dates):
+    """Vectorized month -> season, same mapping as get_season() in add_weather.py."""
+    codes = _MONTH_TO_SEASON[pd.DatetimeIndex(dates).month.to_numpy()]
+    return pd.Categorical.from_codes(codes, categories=SEASONS)
+
+# -------------------------
+# 3. Merged CSV -> compact frames
+# -------------------------
+def compact_merged(df):
+    """
+    Split a merged cafe-day frame into (cafes, daily) with compact dtypes.
+
+    geometry, weather_date and season are dropped: geometry and lat/lon are
+    carried once per cafe, and season is recomputed from the date. Rows
+    without a cafe id cannot be keyed to the dimension and are dropped.
+    """
+    df = df.rename(columns={"cafe_place_id": "cafe_id"})
+    df = df[df["cafe_id"].notna()]
+
+    cafes = (df.drop_duplicates(subset=["cafe_id"], keep="last")
+               .set_index("cafe_id")
+               .reindex(columns=list(CAFE_SCHEMA))
+               .sort_index())
+    cafes = cafes.astype(CAFE_SCHEMA)
+
+    daily = pd.DataFrame({
+        "cafe_id": pd.Categorical(df["cafe_id"], categories=cafes.index),
+        "date": pd.to_datetime(df["date"]).astype(DATE_DTYPE),
+    })
+    measures = {c: t for c, t in DAILY_SCHEMA.items() if c not in ("cafe_code", "date")}
+    for column, values in df.reindex(columns=list(measures)).items():
+        daily[column] = pd.to_numeric(values, errors="coerce").astype(measures[column])
+
+    daily = daily.sort_values(["cafe_id", "date"], ignore_index=True)
+    return cafes, daily
+
+
+def load_merged_csv(path=INPUT_CSV):
+    """Read the merged CSV straight into the compact representation."""
+    usecols = lambda c: c not in ("geometry", "weather_date", "season")
+    return compact_merged(pd.read_csv(path, usecols=usecols))
+
+# -------------------------
+# 4. On-disk columnar store
+# -------------------------
+def save_store(cafes, daily, store_dir=STORE_DIR):
+    """
+    Write one .npy file per daily column plus the cafe dimension and a
+    schema.json carrying row counts and a snapshot hash of the contents.
+    """
+    if len(cafes) > MAX_CAFES:
+        raise ValueError(f"{len(cafes)} cafes exceed the {MAX_CAFES} that fit in an int16 cafe_code")
+
+    store_dir = Path(store_dir)
+    (store_dir / "daily").mkdir(parents=True, exist_ok=True)
+
+    columns = {
+        "cafe_code": daily["cafe_id"].cat.codes.to_numpy(),
+        "date": daily["date"].to_numpy().astype("datetime64[D]").astype(np.int64),
+    }
+    for column in DAILY_SCHEMA:
+        if column not in columns:
+            columns[column] = daily[column].to_numpy()
+
+    digest = hashlib.sha256(cafes.reset_index().to_csv(index=False).encode())
+    for column, dtype in DAILY_SCHEMA.items():
+        values = np.ascontiguousarray(columns[column], dtype=dtype)
+        np.save(store_dir / "daily" / f"{column}.npy", values)
+        digest.update(values.tobytes())
+
+    cafes.to_pickle(store_dir / "cafes.pkl")
+    schema = {
+        "cafe_schema": CAFE_SCHEMA,
+        "daily_schema": DAILY_SCHEMA,
+        "n_cafes": len(cafes),
+        "n_rows": len(daily),
+        "snapshot_hash": digest.hexdigest(),
+    }
+    (store_dir / "schema.json").write_text(json.dumps(schema, indent=2))
+    return schema
+
+
+def read_schema(store_dir=STORE_DIR):
+    return json.loads((Path(store_dir) / "schema.json").read_text())
+
+
+def _daily_frame(arrays, cafes, with_season):
+    """Turn raw store arrays back into the in-memory daily frame."""
+    daily = pd.DataFrame({
+        "cafe_id": pd.Categorical.from_codes(arrays.pop("cafe_code"), categories=cafes.index),
+        "date": arrays.pop("date").astype("datetime64[D]").astype(DATE_DTYPE),
+    })
+    for column, values in arrays.items():
+        daily[column] = values
+    if with_season:
+        daily["season"] = season_from_date(daily["date"])
+    return daily
+
+
+def load_store(store_dir=STORE_DIR, columns=None, with_season=True):
+    """Load (cafes, daily) from the store, optionally only some daily columns."""
+    store_dir = Path(store_dir)
+    cafes = pd.read_pickle(store_dir / "cafes.pkl")
+    wanted = ["cafe_code", "date", *(c for c in (columns or DAILY_SCHEMA) if c not in ("cafe_code", "date"))]
+    arrays = {c: np.load(store_dir / "daily" / f"{c}.npy") for c in wanted}
+    return cafes, _daily_frame(arrays, cafes, with_season)
+
+
+def iter_store_chunks(store_dir=STORE_DIR, chunk_rows=1_000_000, columns=None, with_season=False):
+    """
+    Yield daily frames of at most `chunk_rows` rows. Columns are memory-mapped,
+    so only one chunk is resident at a time regardless of the store size.
+    """
+    store_dir = Path(store_dir)
+    cafes = pd.read_pickle(store_dir / "cafes.pkl")
+    wanted = ["cafe_code", "date", *(c for c in (columns or DAILY_SCHEMA) if c not in ("cafe_code", "date"))]
+    mapped = {c: np.load(store_dir / "daily" / f"{c}.npy", mmap_mode="r") for c in wanted}
+    n_rows = len(mapped["date"])
+    for start in range(0, n_rows, chunk_rows):
+        arrays = {c: np.array(values[start:start + chunk_rows]) for c, values in mapped.items()}
+        yield _daily_frame(arrays, cafes, with_season)
+
+# -------------------------
+# 5. Convert the merged CSV and check the round trip
+# -------------------------
+if __name__ == "__main__":
+    raw = pd.read_csv(INPUT_CSV)
+    cafes, daily = compact_merged(raw)
+    schema = save_store(cafes, daily)
+    print(f"Saved {schema['n_rows']} cafe-day rows for {schema['n_cafes']} cafes to {STORE_DIR}")
+
+    cafes_back, daily_back = load_store()
+    pd.testing.assert_frame_equal(cafes, cafes_back)
+    pd.testing.assert_frame_equal(daily, daily_back.drop(columns=["season"]))
+    assert (season_from_date(pd.to_datetime(raw["date"])).astype(str) == raw["season"].to_numpy()).all()
+
+    raw_bytes = raw.memory_usage(deep=True).sum() / len(raw)
+    compact_bytes = (daily_back.memory_usage(deep=True).sum() + cafes_back.memory_usage(deep=True).sum()) / len(daily_back)
+    print(f"Memory per row: {raw_bytes:.0f} B (CSV frame) -> {compact_bytes:.0f} B (compact), "
+          f"x{raw_bytes / compact_bytes:.1f} smaller")
+    print(f"✅ Round trip OK, snapshot {schema['snapshot_hash'][:12]}")
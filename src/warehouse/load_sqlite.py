@@ -0,0 +1,127 @@
+# src/warehouse/load_sqlite.py
+
+import sqlite3
+import pandas as pd
+from pathlib import Path
+
+# -------------------------
+# 1. Input / Output
+# -------------------------
+INPUT_CSV = Path("data/processed/lap_locations_final_merged.csv")
+OUTPUT_DB = Path("data/processed/lap_warehouse.sqlite")
+
+# Static, once-per-cafe attributes (cafe dimension)
+CAFE_COLUMNS = [
+    "name", "address", "lat", "lon",
+    "cafe_rating", "cafe_user_ratings_total",
+    "elevation_m", "parks_count_1km", "open_bars_count_500m",
+    "nearest_sibling_m", "siblings_count_500m", "competitors_count_500m",
+]
+
+# Daily measurements (fact table)
+DAILY_COLUMNS = ["pm25_aod_proxy", "temp_max", "temp_min", "precip_mm", "ndvi", "nightlight"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cafes (
+    cafe_id TEXT PRIMARY KEY,
+    name TEXT,
+    address TEXT,
+    lat REAL,
+    lon REAL,
+    cafe_rating REAL,
+    cafe_user_ratings_total INTEGER,
+    elevation_m REAL,
+    parks_count_1km INTEGER,
+    open_bars_count_500m INTEGER,
+    nearest_sibling_m REAL,
+    siblings_count_500m INTEGER,
+    competitors_count_500m INTEGER,
+    row_hash TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS cafe_daily (
+    cafe_id TEXT NOT NULL REFERENCES cafes (cafe_id),
+    date TEXT NOT NULL,
+    pm25_aod_proxy REAL,
+    temp_max REAL,
+    temp_min REAL,
+    precip_mm REAL,
+    ndvi REAL,
+    nightlight REAL,
+    row_hash TEXT NOT NULL,
+    PRIMARY KEY (cafe_id, date)
+);
+
+CREATE INDEX IF NOT EXISTS idx_cafe_daily_date ON cafe_daily (date);
+
+-- Rebuilt on every load so databases created with an older column list pick up the current one
+DROP VIEW IF EXISTS cafe_daily_features;
+CREATE VIEW cafe_daily_features AS
+SELECT d.cafe_id, d.date, {cafe_columns}, {daily_columns}
+FROM cafe_daily AS d
+JOIN cafes AS c USING (cafe_id);
+""".format(
+    cafe_columns=", ".join(f"c.{c}" for c in CAFE_COLUMNS),
+    daily_columns=", ".join(f"d.{c}" for c in DAILY_COLUMNS),
+)
+
+# -------------------------
+# 2. Split the merged CSV into dimension and fact frames
+# -------------------------
+def split_merged(df):
+    """Return (cafes, cafe_daily) frames keyed by cafe_id / (cafe_id, date)."""
+    df = df.rename(columns={"cafe_place_id": "cafe_id"})
+    df["date"] = pd.to_datetime(df["date"]).dt.strftime("%Y-%m-%d")
+
+    cafes = (df.reindex(columns=["cafe_id", *CAFE_COLUMNS])
+               .drop_duplicates(subset=["cafe_id"], keep="last"))
+    daily = (df.reindex(columns=["cafe_id", "date", *DAILY_COLUMNS])
+               .drop_duplicates(subset=["cafe_id", "date"], keep="last"))
+    return cafes, daily
+
+# -------------------------
+# 3. Incremental upsert
+# -------------------------
+def upsert_changed(conn, table, df, key_columns):
+    """
+    Insert new rows and update changed ones, skipping rows already stored.
+
+    Each row is fingerprinted with a content hash; only rows whose key is new
+    or whose hash differs from the stored one are written.
+    """
+    df = df.copy()
+    value_columns = [c for c in df.columns if c not in key_columns]
+    df["row_hash"] = pd.util.hash_pandas_object(df[value_columns], index=False).map("{:016x}".format)
+
+    stored = pd.read_sql_query(f"SELECT {', '.join(key_columns)}, row_hash FROM {table}", conn)
+    merged = df[key_columns].merge(stored, on=key_columns, how="left")
+    changed = df[merged["row_hash"].to_numpy() != df["row_hash"].to_numpy()]
+    if changed.empty:
+        return 0
+
+    columns = list(changed.columns)
+    updates = ", ".join(f"{c} = excluded.{c}" for c in columns if c not in key_columns)
+    sql = (f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+           f"ON CONFLICT ({', '.join(key_columns)}) DO UPDATE SET {updates}")
+
+    # sqlite3 cannot bind numpy scalars or NaN, so hand it plain Python objects
+    rows = changed.astype(object).where(changed.notna(), None).itertuples(index=False, name=None)
+    conn.executemany(sql, rows)
+    return len(changed)
+
+# -------------------------
+# 4. Load
+# -------------------------
+if __name__ == "__main__":
+    df = pd.read_csv(INPUT_CSV)
+    cafes, daily = split_merged(df)
+    print(f"Loaded {len(cafes)} cafes and {len(daily)} cafe-day rows from {INPUT_CSV}")
+
+    OUTPUT_DB.parent.mkdir(parents=True, exist_ok=True)
+    with sqlite3.connect(OUTPUT_DB) as conn:
+        conn.executescript(SCHEMA)
+        n_cafes = upsert_changed(conn, "cafes", cafes, ["cafe_id"])
+        n_daily = upsert_changed(conn, "cafe_daily", daily, ["cafe_id", "date"])
+
+    print(f"Upserted {n_cafes} cafe rows and {n_daily} cafe-day rows")
+    print(f"✅ Warehouse ready: {OUTPUT_DB}")
@@ -0,0 +1,66 @@
+import sys
+from pathlib import Path
+
+import geopandas as gpd
+import numpy as np
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src" / "features"))
+from add_cafe_neighbours import EARTH_RADIUS_M, neighbour_features
+
+RADIUS_M = 500
+
+
+def venues(names, lat, lon):
+    return gpd.GeoDataFrame({"name": names}, geometry=gpd.points_from_xy(lon, lat), crs=4326)
+
+
+def haversine_matrix(gdf):
+    """Full pairwise great-circle distances in meters, the slow reference."""
+    lat = np.radians(gdf.geometry.y.to_numpy())
+    lon = np.radians(gdf.geometry.x.to_numpy())
+    dlat = lat[:, None] - lat[None, :]
+    dlon = lon[:, None] - lon[None, :]
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat[:, None]) * np.cos(lat[None, :]) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(a))
+
+
+def test_matches_brute_force():
+    rng = np.random.default_rng(0)
+    n = 300
+    names = rng.choice(["LAP COFFEE", "Lap Coffee ", "Einstein", "Balzac", "Five Elephant", None], size=n)
+    gdf = venues(names, 52.52 + rng.normal(0, 0.01, n), 13.40 + rng.normal(0, 0.015, n))
+
+    features = neighbour_features(gdf, radius_m=RADIUS_M)
+
+    d = haversine_matrix(gdf)
+    np.fill_diagonal(d, np.inf)
+    brand = gdf["name"].fillna("").str.strip().str.upper().to_numpy(dtype=object)
+    same = brand[:, None] == brand[None, :]
+    within = d <= RADIUS_M
+
+    np.testing.assert_array_equal(features[f"siblings_count_{RADIUS_M}m"], (within & same).sum(axis=1))
+    np.testing.assert_array_equal(features[f"competitors_count_{RADIUS_M}m"], (within & ~same).sum(axis=1))
+    # Rounded to 0.1 m in the output, so allow just over half a step
+    np.testing.assert_allclose(features["nearest_sibling_m"], np.where(same, d, np.inf).min(axis=1), atol=0.06)
+
+
+def test_single_venue():
+    features = neighbour_features(venues(["LAP COFFEE"], [52.5], [13.4]), radius_m=RADIUS_M)
+
+    assert len(features) == 1
+    assert np.isnan(features["nearest_sibling_m"].iloc[0])
+    assert features[f"siblings_count_{RADIUS_M}m"].iloc[0] == 0
+    assert features[f"competitors_count_{RADIUS_M}m"].iloc[0] == 0
+
+
+def test_no_pairs_within_radius():
+    # ~11 km apart: the pair query is empty but siblings still have a nearest distance
+    gdf = venues(["LAP COFFEE", "LAP COFFEE", "Einstein"], [52.4, 52.5, 52.6], [13.4, 13.4, 13.4])
+    features = neighbour_features(gdf, radius_m=RADIUS_M)
+
+    assert features[f"siblings_count_{RADIUS_M}m"].tolist() == [0, 0, 0]
+    assert features[f"competitors_count_{RADIUS_M}m"].tolist() == [0, 0, 0]
+    expected = haversine_matrix(gdf)[0, 1]
+    assert features["nearest_sibling_m"].iloc[:2].tolist() == pytest.approx([expected, expected], abs=0.06)
+    assert np.isnan(features["nearest_sibling_m"].iloc[2])
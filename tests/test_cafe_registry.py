@@ -0,0 +1,134 @@
+import sys
+from pathlib import Path
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src" / "features"))
+from cafe_registry import LAYER, load_registry, merge_static, pending_cafes
+
+VALUE_COLUMNS = ["parks_count_1km"]
+
+
+def write_cafes(path, rows):
+    """Write (place_id, name, address, lat, lon) rows as a lap_locations-style GeoPackage."""
+    place_id, name, address, lat, lon = zip(*rows)
+    gdf = gpd.GeoDataFrame(
+        {"place_id": place_id, "name": name, "address": address},
+        geometry=gpd.points_from_xy(lon, lat), crs=4326,
+    )
+    gdf.to_file(path, layer=LAYER, driver="GPKG")
+
+
+@pytest.fixture
+def cafes():
+    return [
+        ("id_a", "LAP COFFEE", "Akazienstraße 3A, 10823 Berlin", 52.4867684, 13.35549),
+        ("id_b", "LAP COFFEE", "Kantstraße 23, 10623 Berlin", 52.5061509, 13.3208272),
+        ("id_c", "LAP COFFEE", "Torstraße 1, 10119 Berlin", 52.5291, 13.4011),
+    ]
+
+
+def run_stage(registry, output_path, values):
+    """Mimic a static stage: compute `values` (cafe_id -> value) for pending cafes and save."""
+    pending, cached = pending_cafes(registry, output_path, VALUE_COLUMNS)
+    computed = pd.DataFrame(
+        {"parks_count_1km": [values[c] for c in pending["cafe_id"]]},
+        index=pd.Index(pending["cafe_id"], name="cafe_id"),
+    )
+    merge_static(registry, cached, computed).to_file(output_path, layer=LAYER, driver="GPKG")
+    return pending
+
+
+def test_load_registry_dedups_and_keys(cafes, tmp_path):
+    rows = cafes + [
+        ("id_a", "LAP COFFEE", "Akazienstraße 3A, 10823 Berlin", 52.4867684, 13.35549),
+        (None, "LAP COFFEE", "Torstraße 1, 10119 Berlin", 52.5291, 13.4011),
+        (None, "LAP COFFEE", None, 52.5, 13.4),
+    ]
+    write_cafes(tmp_path / "in.gpkg", rows)
+    registry = load_registry(tmp_path / "in.gpkg")
+
+    assert list(registry["cafe_id"]) == ["id_a", "id_b", "id_c", "coord:52500000,13400000"]
+    assert registry["fingerprint"].is_unique
+    assert registry["address"].iloc[-1] == ""
+
+
+def test_first_run_computes_everything(cafes, tmp_path):
+    write_cafes(tmp_path / "in.gpkg", cafes)
+    registry = load_registry(tmp_path / "in.gpkg")
+
+    pending = run_stage(registry, tmp_path / "out.gpkg", {"id_a": 1, "id_b": 2, "id_c": 3})
+    assert list(pending["cafe_id"]) == ["id_a", "id_b", "id_c"]
+
+    pending, cached = pending_cafes(registry, tmp_path / "out.gpkg", VALUE_COLUMNS)
+    assert pending.empty
+    assert cached["parks_count_1km"].to_dict() == {"id_a": 1, "id_b": 2, "id_c": 3}
+
+
+def test_new_cafe_is_pending(cafes, tmp_path):
+    write_cafes(tmp_path / "in.gpkg", cafes[:2])
+    run_stage(load_registry(tmp_path / "in.gpkg"), tmp_path / "out.gpkg", {"id_a": 1, "id_b": 2})
+
+    write_cafes(tmp_path / "in.gpkg", cafes)
+    pending, cached = pending_cafes(load_registry(tmp_path / "in.gpkg"), tmp_path / "out.gpkg", VALUE_COLUMNS)
+    assert list(pending["cafe_id"]) == ["id_c"]
+    assert list(cached.index) == ["id_a", "id_b"]
+
+
+@pytest.mark.parametrize("change", [
+    lambda row: (*row[:3], row[3] + 0.001, row[4]),             # moved ~100 m
+    lambda row: (*row[:2], "Kantstraße 25, 10623 Berlin", *row[3:]),  # re-addressed
+])
+def test_changed_location_is_pending(cafes, tmp_path, change):
+    write_cafes(tmp_path / "in.gpkg", cafes)
+    run_stage(load_registry(tmp_path / "in.gpkg"), tmp_path / "out.gpkg", {"id_a": 1, "id_b": 2, "id_c": 3})
+
+    write_cafes(tmp_path / "in.gpkg", [cafes[0], change(cafes[1]), cafes[2]])
+    pending, cached = pending_cafes(load_registry(tmp_path / "in.gpkg"), tmp_path / "out.gpkg", VALUE_COLUMNS)
+    assert list(pending["cafe_id"]) == ["id_b"]
+    assert list(cached.index) == ["id_a", "id_c"]
+
+
+def test_output_without_registry_columns_recomputes_all(cafes, tmp_path):
+    write_cafes(tmp_path / "in.gpkg", cafes)
+    registry = load_registry(tmp_path / "in.gpkg")
+
+    # Output written by the old lat/lon-merging scripts: values but no cafe_id/fingerprint
+    old = registry.drop(columns=["cafe_id", "fingerprint"]).assign(parks_count_1km=[1, 2, 3])
+    old.to_file(tmp_path / "out.gpkg", layer=LAYER, driver="GPKG")
+
+    pending, cached = pending_cafes(registry, tmp_path / "out.gpkg", VALUE_COLUMNS)
+    assert len(pending) == len(registry)
+    assert cached.empty
+
+
+def test_failed_lookup_is_retried(cafes, tmp_path):
+    write_cafes(tmp_path / "in.gpkg", cafes)
+    registry = load_registry(tmp_path / "in.gpkg")
+    run_stage(registry, tmp_path / "out.gpkg", {"id_a": 1, "id_b": np.nan, "id_c": 3})
+
+    pending = run_stage(registry, tmp_path / "out.gpkg", {"id_b": 2})
+    assert list(pending["cafe_id"]) == ["id_b"]
+
+    pending, cached = pending_cafes(registry, tmp_path / "out.gpkg", VALUE_COLUMNS)
+    assert pending.empty
+    assert cached["parks_count_1km"].to_dict() == {"id_a": 1, "id_b": 2, "id_c": 3}
+
+
+def test_merge_static_keeps_numeric_dtype(cafes, tmp_path):
+    write_cafes(tmp_path / "in.gpkg", cafes)
+    registry = load_registry(tmp_path / "in.gpkg")
+    _, empty = pending_cafes(registry, tmp_path / "missing.gpkg", VALUE_COLUMNS)
+    computed = pd.DataFrame({"parks_count_1km": [1, None, 3]}, index=pd.Index(registry["cafe_id"], name="cafe_id"))
+
+    merged = merge_static(registry, empty, computed)
+    assert pd.api.types.is_numeric_dtype(merged["parks_count_1km"])
+
+    merged.to_file(tmp_path / "out.gpkg", layer=LAYER, driver="GPKG")
+    back = gpd.read_file(tmp_path / "out.gpkg", layer=LAYER)
+    assert pd.api.types.is_numeric_dtype(back["parks_count_1km"])
+    assert back["parks_count_1km"].tolist()[::2] == [1, 3]
+    assert np.isnan(back["parks_count_1km"].iloc[1])
@@ -0,0 +1,110 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src" / "features"))
+from ee_scheduler import AdaptiveLimiter, evaluate_all
+
+
+class FakeServer:
+    """Stands in for Earth Engine: throttles once more than `cap` requests run at a time."""
+
+    def __init__(self, cap, latency_s=0.01):
+        self.cap = cap
+        self.latency_s = latency_s
+        self.active = 0
+        self.peak = 0
+        self.throttled = 0
+        self.lock = threading.Lock()
+
+
+class FakeComputation:
+    """Stands in for an ee.ComputedObject evaluated on a FakeServer."""
+
+    def __init__(self, server, value, error=None):
+        self.server = server
+        self.value = value
+        self.error = error
+        self.calls = 0
+
+    def getInfo(self):
+        server = self.server
+        with server.lock:
+            self.calls += 1
+            if self.error is not None:
+                raise self.error
+            if server.active >= server.cap:
+                server.throttled += 1
+                raise RuntimeError("Too many concurrent aggregations.")
+            server.active += 1
+            server.peak = max(server.peak, server.active)
+        try:
+            time.sleep(server.latency_s)
+            return {"value": self.value}
+        finally:
+            with server.lock:
+                server.active -= 1
+
+
+def test_results_keep_order_under_throttling():
+    server = FakeServer(cap=3)
+    computations = [FakeComputation(server, i) for i in range(40)]
+
+    results = evaluate_all(computations, max_in_flight=8, max_retries=20, backoff_base_s=0.005, backoff_cap_s=0.05)
+
+    assert server.throttled > 0
+    assert server.peak <= 3
+    assert [r["value"] for r in results] == list(range(40))
+
+
+def test_concurrency_speeds_up_unthrottled_requests():
+    computations = [FakeComputation(FakeServer(cap=64, latency_s=0.05), i) for i in range(16)]
+
+    start = time.perf_counter()
+    evaluate_all(computations, max_in_flight=8)
+    assert time.perf_counter() - start < 16 * 0.05 / 2
+
+
+def test_other_errors_are_not_retried():
+    server = FakeServer(cap=8)
+    bad = FakeComputation(server, 1, error=ValueError("Image.reduceRegions: bad geometry"))
+
+    results = evaluate_all([FakeComputation(server, 0), bad], default="missing")
+
+    assert results == [{"value": 0}, "missing"]
+    assert bad.calls == 1
+
+
+def test_retries_are_bounded():
+    server = FakeServer(cap=8)
+    quota = FakeComputation(server, 0, error=RuntimeError("Quota exceeded"))
+
+    results = evaluate_all([quota], max_retries=3, backoff_base_s=0.001)
+
+    assert results == [None]
+    assert quota.calls == 4
+
+
+def test_limiter_halves_once_per_congestion_window():
+    limiter = AdaptiveLimiter(8)
+    epochs = [limiter.acquire() for _ in range(8)]
+
+    # Eight requests from the same window all throttled: one decrease, not 8 -> 1
+    for epoch in epochs:
+        limiter.release(epoch, throttled=True)
+    assert limiter.limit == 4
+
+    # A request started after that decrease signals new congestion
+    limiter.release(limiter.acquire(), throttled=True)
+    assert limiter.limit == 2
+
+
+def test_limiter_grows_back_on_success():
+    limiter = AdaptiveLimiter(4)
+    limiter.release(limiter.acquire(), throttled=True)
+    assert limiter.limit == 2
+
+    for _ in range(20):
+        limiter.release(limiter.acquire())
+    assert limiter.limit == 4
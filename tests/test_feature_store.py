@@ -0,0 +1,124 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src" / "warehouse"))
+from feature_store import (
+    CAFE_SCHEMA,
+    DAILY_SCHEMA,
+    compact_merged,
+    iter_store_chunks,
+    load_store,
+    read_schema,
+    save_store,
+    season_from_date,
+)
+
+
+@pytest.fixture
+def merged():
+    """Small merged cafe-day frame in the layout of lap_locations_final_merged.csv."""
+    dates = pd.date_range("2024-11-28", "2025-03-03").strftime("%Y-%m-%d")
+    cafes = [
+        ("id_b", "LAP COFFEE", "Kantstraße 23, 10623 Berlin", 52.5061509, 13.3208272, 4.3, 127),
+        ("id_a", "LAP COFFEE", "Akazienstraße 3A, 10823 Berlin", 52.4867684, 13.35549, 4.7, 151),
+    ]
+    rng = np.random.default_rng(0)
+    rows = []
+    for cafe_id, name, address, lat, lon, rating, n_ratings in cafes:
+        for date in dates:
+            rows.append({
+                "date": date, "name": name, "lat": lat, "lon": lon, "address": address,
+                "pm25_aod_proxy": rng.uniform(0, 0.3),
+                "geometry": f"POINT ({lon} {lat})", "weather_date": date,
+                "temp_max": rng.uniform(-5, 10), "temp_min": rng.uniform(-10, 0),
+                "precip_mm": rng.uniform(0, 5),
+                "cafe_rating": rating, "cafe_user_ratings_total": n_ratings,
+                "ndvi": np.nan if rng.uniform() < 0.8 else rng.uniform(0, 0.6),
+                "nightlight": rng.uniform(10, 30),
+                "cafe_place_id": cafe_id,
+                "elevation_m": 45.0, "parks_count_1km": 11, "open_bars_count_500m": 12,
+            })
+    df = pd.DataFrame(rows)
+    month = pd.to_datetime(df["date"]).dt.month
+    df["season"] = np.select(
+        [month.isin([3, 4, 5]), month.isin([6, 7, 8]), month.isin([9, 10, 11])],
+        ["Spring", "Summer", "Autumn"], "Winter")
+    return df
+
+
+def test_compact_dtypes(merged):
+    cafes, daily = compact_merged(merged)
+
+    assert list(cafes.index) == ["id_a", "id_b"]
+    assert cafes.dtypes.astype(str).to_dict() == {c: t for c, t in CAFE_SCHEMA.items()}
+    assert set(daily.columns) == {"cafe_id", "date", *DAILY_SCHEMA} - {"cafe_code"}
+    assert daily["cafe_id"].dtype == "category"
+    assert daily["date"].dtype == "datetime64[ns]"
+    assert (daily["temp_max"].dtype, daily["ndvi"].dtype) == (np.float32, np.float32)
+    assert len(daily) == len(merged)
+
+
+def test_round_trip(merged, tmp_path):
+    cafes, daily = compact_merged(merged)
+    schema = save_store(cafes, daily, tmp_path)
+
+    assert schema == read_schema(tmp_path)
+    assert (schema["n_cafes"], schema["n_rows"]) == (2, len(merged))
+
+    cafes_back, daily_back = load_store(tmp_path, with_season=False)
+    pd.testing.assert_frame_equal(cafes, cafes_back)
+    pd.testing.assert_frame_equal(daily, daily_back)
+
+
+def test_chunks_match_full_load(merged, tmp_path):
+    cafes, daily = compact_merged(merged)
+    save_store(cafes, daily, tmp_path)
+
+    chunks = list(iter_store_chunks(tmp_path, chunk_rows=50))
+    assert all(len(chunk) <= 50 for chunk in chunks)
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), daily)
+
+
+def test_column_subset(merged, tmp_path):
+    save_store(*compact_merged(merged), tmp_path)
+
+    _, daily = load_store(tmp_path, columns=["ndvi"], with_season=False)
+    assert list(daily.columns) == ["cafe_id", "date", "ndvi"]
+
+
+def test_season_derived_from_date(merged, tmp_path):
+    save_store(*compact_merged(merged), tmp_path)
+    _, daily = load_store(tmp_path)
+
+    assert list(season_from_date(pd.to_datetime(merged["date"])).astype(str)) == list(merged["season"])
+    expected = merged.set_index(["cafe_place_id", "date"])["season"]
+    keys = zip(daily["cafe_id"].astype(str), daily["date"].dt.strftime("%Y-%m-%d"))
+    assert list(daily["season"].astype(str)) == list(expected.loc[list(keys)])
+
+
+def test_rows_without_cafe_id_are_dropped(merged, tmp_path):
+    merged.loc[:9, "cafe_place_id"] = np.nan
+    cafes, daily = compact_merged(merged)
+
+    assert cafes.index.notna().all()
+    assert len(daily) == len(merged) - 10
+    assert daily["cafe_id"].notna().all()
+
+    save_store(cafes, daily, tmp_path)
+    _, daily_back = load_store(tmp_path, with_season=False)
+    pd.testing.assert_frame_equal(daily, daily_back)
+
+
+def test_too_many_cafes_for_int16_code(tmp_path):
+    ids = [f"id_{i}" for i in range(40_000)]
+    cafes = pd.DataFrame(index=pd.Index(ids, name="cafe_id"))
+    daily = pd.DataFrame({
+        "cafe_id": pd.Categorical(ids[-1:], categories=ids),
+        "date": pd.to_datetime(["2025-01-01"]),
+    })
+    with pytest.raises(ValueError, match="int16"):
+        save_store(cafes, daily, tmp_path)
@@ -0,0 +1,68 @@
+import sqlite3
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src" / "warehouse"))
+from load_sqlite import CAFE_COLUMNS, DAILY_COLUMNS, SCHEMA, split_merged, upsert_changed
+
+
+@pytest.fixture
+def merged():
+    """Two cafes over three days in the layout of lap_locations_final_merged.csv."""
+    rows = []
+    for cafe_id, lat in [("id_a", 52.4867684), ("id_b", 52.5061509)]:
+        for day, date in enumerate(["2025-01-01", "2025-01-02", "2025-01-03"]):
+            rows.append({
+                "date": date, "cafe_place_id": cafe_id, "name": "LAP COFFEE",
+                "address": f"{cafe_id} street", "lat": lat, "lon": 13.35, "cafe_rating": 4.5,
+                "cafe_user_ratings_total": 100, "elevation_m": 45.0, "parks_count_1km": 11,
+                "open_bars_count_500m": 12, "pm25_aod_proxy": 0.1 * day, "temp_max": 5.0,
+                "temp_min": -1.0, "precip_mm": 0.0, "ndvi": np.nan, "nightlight": 20.0,
+                "geometry": f"POINT (13.35 {lat})", "season": "Winter",
+            })
+    return pd.DataFrame(rows)
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    conn.executescript(SCHEMA)
+    yield conn
+    conn.close()
+
+
+def load(conn, merged):
+    cafes, daily = split_merged(merged.copy())
+    return (upsert_changed(conn, "cafes", cafes, ["cafe_id"]),
+            upsert_changed(conn, "cafe_daily", daily, ["cafe_id", "date"]))
+
+
+def test_upsert_is_idempotent(conn, merged):
+    assert load(conn, merged) == (2, 6)
+    assert load(conn, merged) == (0, 0)
+    assert conn.execute("SELECT COUNT(*) FROM cafe_daily").fetchone() == (6,)
+
+
+def test_only_changed_rows_are_written(conn, merged):
+    load(conn, merged)
+
+    merged.loc[merged["date"] == "2025-01-02", "ndvi"] = 0.4
+    merged.loc[merged["cafe_place_id"] == "id_b", "cafe_rating"] = 4.6
+    merged = pd.concat([merged, merged.iloc[[-1]].assign(date="2025-01-04")])
+
+    assert load(conn, merged) == (1, 3)
+    assert conn.execute("SELECT cafe_rating FROM cafes WHERE cafe_id = 'id_b'").fetchone() == (4.6,)
+    assert conn.execute("SELECT COUNT(*) FROM cafe_daily WHERE ndvi = 0.4").fetchone() == (2,)
+    assert load(conn, merged) == (0, 0)
+
+
+def test_view_exposes_features_without_row_hash(conn, merged):
+    load(conn, merged)
+
+    view = pd.read_sql_query("SELECT * FROM cafe_daily_features", conn)
+    assert list(view.columns) == ["cafe_id", "date", *CAFE_COLUMNS, *DAILY_COLUMNS]
+    assert len(view) == 6
@@ -0,0 +1,76 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src" / "features"))
+from ndvi_windows import windows_to_daily
+
+WINDOW_DAYS = 10
+
+
+def expand(values, fill="interpolate", n_days=None):
+    """Run windows_to_daily for one cafe whose 10-day windows start on 2025-01-01."""
+    windows = pd.date_range("2025-01-01", periods=len(values), freq=f"{WINDOW_DAYS}D")
+    dates = pd.date_range("2025-01-01", periods=n_days or len(values) * WINDOW_DAYS)
+    window_values = pd.DataFrame({"cafe": values}, index=windows, dtype=float)
+    return windows_to_daily(window_values, dates, WINDOW_DAYS, fill)["cafe"]
+
+
+def test_leading_edge_covers_first_half_window():
+    daily = expand([0.2, 0.4, 0.6])
+
+    # Centred on Jan 6, so Jan 1-5 take the first composite instead of NaN
+    assert daily.loc["2025-01-01":"2025-01-06"].tolist() == [0.2] * 6
+    assert daily.loc["2025-01-16"] == pytest.approx(0.4)
+    assert daily.loc["2025-01-11"] == pytest.approx(0.3)
+
+
+def test_trailing_edge_is_bounded():
+    daily = expand([0.2, np.nan, np.nan, np.nan])
+
+    # Held for one window past the composite's centre (Jan 6), then NaN
+    assert daily.loc["2025-01-01":"2025-01-16"].tolist() == [0.2] * 16
+    assert daily.loc["2025-01-17":].isna().all()
+
+    # The last composite of the period reaches the end of its own window
+    assert expand([0.2, 0.4]).loc["2025-01-16":"2025-01-20"].tolist() == [0.4] * 5
+
+
+def test_one_missing_window_is_bridged():
+    daily = expand([0.2, np.nan, 0.4])
+
+    assert daily.notna().all()
+    assert daily.loc["2025-01-16"] == pytest.approx(0.3)
+    assert daily.loc["2025-01-06":"2025-01-26"].is_monotonic_increasing
+
+
+def test_longer_gap_stays_nan():
+    daily = expand([0.2, np.nan, np.nan, 0.5])
+
+    # Centres Jan 6 and Feb 5: interpolation reaches 10 days from each,
+    # leaving the middle of the cloudy spell empty
+    assert daily.loc["2025-01-17":"2025-01-25"].isna().all()
+    assert daily.loc[:"2025-01-16"].notna().all()
+    assert daily.loc["2025-01-26":].notna().all()
+
+
+def test_ffill_holds_only_its_own_window():
+    daily = expand([0.2, np.nan, 0.4], fill="ffill")
+
+    assert daily.loc["2025-01-01":"2025-01-10"].tolist() == [0.2] * 10
+    assert daily.loc["2025-01-11":"2025-01-20"].isna().all()
+    assert daily.loc["2025-01-21":"2025-01-30"].tolist() == [0.4] * 10
+
+
+def test_cafes_are_filled_independently():
+    windows = pd.date_range("2025-01-01", periods=3, freq=f"{WINDOW_DAYS}D")
+    window_values = pd.DataFrame({"a": [0.2, np.nan, np.nan], "b": [np.nan, np.nan, 0.5]}, index=windows)
+    daily = windows_to_daily(window_values, pd.date_range("2025-01-01", "2025-01-30"), WINDOW_DAYS)
+
+    assert list(daily.columns) == ["a", "b"]
+    assert daily["a"].notna().sum() == 16
+    # b's only composite is centred on Jan 26 and covers the half-window before it
+    assert daily["b"].first_valid_index() == pd.Timestamp("2025-01-21")